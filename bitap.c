@@ -0,0 +1,103 @@
+/*
+ * AVX2 Shift-And kernel for patterns of up to 32 characters, loaded by
+ * bitvector.py through ctypes.
+ *
+ * Build with:
+ *     gcc -O3 -shared -fPIC -o bitap.so bitap.c
+ *
+ * The AVX2 version is selected at runtime, CPUs without AVX2 use the scalar
+ * version instead.
+ */
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+#include <immintrin.h>
+
+#define BITAP_MAX_PAT 32
+
+/* Record the count-th match, positions that don't fit in out are only counted */
+static inline ptrdiff_t record(int64_t *out, ptrdiff_t out_len, ptrdiff_t count, ptrdiff_t pos)
+{
+    if (count < out_len) {
+        out[count] = pos;
+    }
+    return count + 1;
+}
+
+/*
+ * Check every alignment from start to stop - 1 one at a time, recording the
+ * 1 based position of each match. Returns the new number of matches.
+ */
+static ptrdiff_t bitap_scalar(const unsigned char *text, ptrdiff_t start, ptrdiff_t stop,
+                              const unsigned char *pat, ptrdiff_t m,
+                              int64_t *out, ptrdiff_t out_len, ptrdiff_t count)
+{
+    for (ptrdiff_t i = start; i < stop; i++) {
+        if (memcmp(text + i, pat, (size_t)m) == 0) {
+            count = record(out, out_len, count, i + 1);
+        }
+    }
+    return count;
+}
+
+/*
+ * Process the text 32 alignments at a time. Bit k of state is bit j of the
+ * Shift-And state for the alignment starting at i + k, so ANDing in the
+ * comparison of text[i + j .. i + j + 31] with pat[j] for every j leaves the
+ * bits of the alignments that match the whole pattern.
+ */
+__attribute__((target("avx2")))
+static ptrdiff_t bitap_avx2(const unsigned char *text, ptrdiff_t n,
+                            const unsigned char *pat, ptrdiff_t m,
+                            int64_t *out, ptrdiff_t out_len)
+{
+    __m256i broadcast[BITAP_MAX_PAT];
+    ptrdiff_t count = 0;
+    ptrdiff_t i = 0;
+
+    /* Fill a register with each character of the pattern */
+    for (ptrdiff_t j = 0; j < m; j++) {
+        broadcast[j] = _mm256_set1_epi8((char)pat[j]);
+    }
+
+    /* Every block has to be able to read 32 + m - 1 characters of the text */
+    for (; i + 32 + m - 1 <= n; i += 32) {
+        uint32_t state = 0xFFFFFFFFu;
+
+        for (ptrdiff_t j = 0; j < m && state; j++) {
+            __m256i v = _mm256_loadu_si256((const __m256i *)(text + i + j));
+            state &= (uint32_t)_mm256_movemask_epi8(_mm256_cmpeq_epi8(v, broadcast[j]));
+        }
+
+        /* Append the position of each set bit, lowest bit is the leftmost alignment */
+        while (state) {
+            count = record(out, out_len, count, i + __builtin_ctz(state) + 1);
+            state &= state - 1;
+        }
+    }
+
+    /* Remaining alignments that don't fill a whole block */
+    return bitap_scalar(text, i, n - m + 1, pat, m, out, out_len, count);
+}
+
+/*
+ * Find every occurrence of pat in text, writing the 1 based positions of the
+ * first out_len occurrences to out in increasing order. m must be between 1
+ * and BITAP_MAX_PAT. Returns the total number of occurrences, which is larger
+ * than out_len when out was too small to hold all of them.
+ */
+ptrdiff_t bitap32(const char *text, ptrdiff_t n, const char *pat, ptrdiff_t m,
+                  int64_t *out, ptrdiff_t out_len)
+{
+    const unsigned char *t = (const unsigned char *)text;
+    const unsigned char *p = (const unsigned char *)pat;
+
+    if (m < 1 || m > BITAP_MAX_PAT || m > n) {
+        return 0;
+    }
+
+    if (__builtin_cpu_supports("avx2")) {
+        return bitap_avx2(t, n, p, m, out, out_len);
+    }
+    return bitap_scalar(t, 0, n - m + 1, p, m, out, out_len, 0);
+}
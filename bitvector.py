@@ -1,56 +1,335 @@
-from bitarray import *
-import sys
-from tools import read_file, write_file
+import ctypes
+import os
+from collections import defaultdict
+from tools import is_ascii, run_pat_match, to_bytes
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-def bitvector_pat_match(text: str, pat: str) -> list[int]:
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Longest pattern that is matched with NumPy, every pattern character costs one pass over the text
+NUMPY_MAX_PAT = 64
+# Longest pattern the AVX2 kernel in bitap.c can match, one pattern character per bit of a 32 bit mask
+BITAP_MAX_PAT = 32
+# Number of positions the output buffer of the AVX2 kernel starts with
+BITAP_OUT_LEN = 4096
+# Number of pattern characters stored in each word of the Numba state
+WORD_SIZE = 64
+
+
+def load_bitap() -> ctypes.CDLL | None:
+    """
+    Load the compiled AVX2 Shift-And kernel from bitap.so next to this file, the
+    library is built from bitap.c with gcc -O3 -shared -fPIC -o bitap.so bitap.c
+
+    Returns:
+    ctypes.CDLL | None: The loaded library, None if it hasn't been built
+    """
+    lib_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bitap.so")
+    try:
+        lib = ctypes.CDLL(lib_path)
+    except OSError:
+        return None
+
+    lib.bitap32.argtypes = [ctypes.c_char_p, ctypes.c_ssize_t, ctypes.c_char_p, ctypes.c_ssize_t,
+                            ctypes.POINTER(ctypes.c_int64), ctypes.c_ssize_t]
+    lib.bitap32.restype = ctypes.c_ssize_t
+    return lib
+
+
+bitap = load_bitap()
+
+
+def bitvector_pat_match(text: str | bytes | memoryview, pat: str | bytes) -> list[int]:
+    """
+    Perform exact pattern matching on text with pattern using the Shift-And
+    algorithm. Uses the AVX2 kernel when bitap.so is built and the pattern is
+    short enough, then the Numba version when Numba is installed, then the NumPy
+    version, otherwise falls back to the pure Python version
+
+    Parameters:
+    text (str | bytes | memoryview): Text string to perform pattern matching on
+    pat (str | bytes): Pattern string to be used to pattern match in text
+
+    Returns:
+    list[int]: A list of integers that states the occurrence of the pattern,
+               empty for an empty pattern whichever version is used
+    """
+    m = len(pat)
+    if not m:
+        return []
+
+    ascii_only = is_ascii(text) and is_ascii(pat)
+
+    if bitap is not None and m <= BITAP_MAX_PAT and ascii_only:
+        return bitvector_pat_match_c(text, pat)
+
+    if njit is not None and ascii_only:
+        return bitvector_pat_match_nb(text, pat)
+
+    if np is not None and m <= NUMPY_MAX_PAT and ascii_only:
+        return bitvector_pat_match_np(text, pat)
+
+    return bitvector_pat_match_py(text, pat)
+
+
+def bitvector_pat_match_py(text: str | bytes | memoryview, pat: str | bytes) -> list[int]:
     """
-    Using bitvectors and bit operations like left shifts and bitwise OR 
-    to perform exact pattern matching on text with pattern
+    Using the Shift-And (bitap) algorithm with a Python int as the bitvector
+    and bit operations like left shifts and bitwise AND to perform exact
+    pattern matching on text with pattern
 
     Parameters:
-    text (str): Text string to perform pattern matching on
-    pat (str): Pattern string to be used to pattern match in text
+    text (str | bytes | memoryview): Text string to perform pattern matching on
+    pat (str | bytes): Pattern string to be used to pattern match in text
 
     Returns:
     list[int]: A list of integers that states the occurrence of the pattern
+
+    Note:
+    - Bit j of the state is set when pat[0..j] matches the text ending at the
+      current character, so a match is found when bit m - 1 is set
+    - Each pattern character is preprocessed into a mask once, so every text
+      character only costs a lookup and three bit operations, O(n + m)
+    - ASCII text and pattern are matched as bytes, so the masks are looked up in a
+      256 entry list by the character code read directly from the bytes
+    - The loop only reads local variables, so generating a copy of it for each pattern
+      with m, the match bit and the masks as literals doesn't make it any faster
     """
     m = len(pat)
-    n = len(text)
-    # Initialize bit array and set all to 1, at -1 index the string is unmatched in all positions
-    bitvector = bitarray(m)
-    bitvector.setall(1)
+    if is_ascii(text) and is_ascii(pat):
+        text = to_bytes(text)
+        pat = to_bytes(pat)
+        masks = [0] * 256
+    else:
+        # Characters of the text that aren't in the pattern get an empty mask
+        masks = defaultdict(int)
 
-    # Initialize delta bit array
-    delta = bitarray(m)
+    # Precompute the mask of each character, bit j is set when pat[j] is the character
+    for j, c in enumerate(pat):
+        masks[c] |= 1 << j
+
+    # Bit that is set in the state when the whole pattern is matched
+    match_bit = 1 << (m - 1)
+    state = 0
 
     occurrences = []
 
+    # For each of the characters in the text, counting the position a match ending at
+    # the character starts at, (i + 1) - m + 1 for index i, so a match costs nothing more
+    for pos, c in enumerate(text, 2 - m):
+        # Extend every partial match by one character and start a new one at this character
+        state = ((state << 1) | 1) & masks[c]
+
+        # Check if the last bit is set, if it is then it means theres a match
+        if state & match_bit:
+            # Append the position where the match was found
+            occurrences.append(pos)
+
+    return occurrences
+
+
+def bitvector_pat_match_np(text: str | bytes | memoryview, pat: str | bytes) -> list[int]:
+    """
+    Vectorized version of the Shift-And algorithm using NumPy. Instead of
+    streaming the state over the text one character at a time, bit j of the
+    state for every alignment of the pattern is computed at once by comparing
+    the whole text with pat[j], and the bits are ANDed together
+
+    Parameters:
+    text (str | bytes | memoryview): Text string to perform pattern matching on, must be ASCII
+    pat (str | bytes): Pattern string to be used to pattern match in text, must be ASCII
+
+    Returns:
+    list[int]: A list of integers that states the occurrence of the pattern
+
+    Note:
+    - Does O(n * m) byte comparisons, but each comparison over the text runs as a
+      single SIMD pass in NumPy, so it is only used for short patterns
+    """
+    text_arr = np.frombuffer(to_bytes(text), np.uint8)
+    pat_arr = np.frombuffer(to_bytes(pat), np.uint8)
+    m = len(pat_arr)
+
+    # Number of positions in the text the pattern can start at
+    num_alignments = len(text_arr) - m + 1
+    if num_alignments <= 0:
+        return []
+
+    # For each of the characters in the pattern, AND in whether the text matches it at that offset
+    match = text_arr[:num_alignments] == pat_arr[0]
+    for j in range(1, m):
+        match &= text_arr[j:j + num_alignments] == pat_arr[j]
+
+    # Convert the alignments with a full match to 1 based positions
+    return (np.flatnonzero(match) + 1).tolist()
+
+
+def bitvector_pat_match_c(text: str | bytes | memoryview, pat: str | bytes) -> list[int]:
+    """
+    Shift-And using the AVX2 kernel from bitap.c, every 32 byte block of the text
+    is compared with each character of the pattern in one instruction and the
+    resulting 32 bit masks are ANDed into the state of 32 alignments at once
+
+    Parameters:
+    text (str | bytes | memoryview): Text string to perform pattern matching on, must be ASCII
+    pat (str | bytes): Pattern string to be used to pattern match in text, must be ASCII
+                       and contain 1 to BITAP_MAX_PAT characters
+
+    Returns:
+    list[int]: A list of integers that states the occurrence of the pattern
+
+    Note:
+    - A memoryview text is copied into bytes first, since c_char_p only takes bytes and a
+      read only mapping can't be passed to ctypes without a copy
+    """
+    text_bytes = to_bytes(text)
+    if isinstance(text_bytes, memoryview):
+        text_bytes = bytes(text_bytes)
+    pat_bytes = to_bytes(pat)
+    n = len(text_bytes)
+    m = len(pat_bytes)
+
+    num_alignments = n - m + 1
+    if num_alignments <= 0:
+        return []
+
+    # Buffer for the kernel to write the positions to, most texts have far fewer matches than alignments
+    out_len = min(num_alignments, BITAP_OUT_LEN)
+    out = (ctypes.c_int64 * out_len)()
+    count = bitap.bitap32(text_bytes, n, pat_bytes, m, out, out_len)
+
+    # If the buffer was too small then run again with a buffer that fits every match
+    if count > out_len:
+        out = (ctypes.c_int64 * count)()
+        count = bitap.bitap32(text_bytes, n, pat_bytes, m, out, count)
+
+    return out[:count]
+
+
+def shift_and_kernel_64(text_arr: "np.ndarray", masks: "np.ndarray", m: int) -> "np.ndarray":
+    """
+    Shift-And for patterns of at most WORD_SIZE characters, compiled with Numba when
+    it is installed. The whole state fits in a single uint64 which stays in a register
+
+    Parameters:
+    text_arr (np.ndarray): uint8 array of the text
+    masks (np.ndarray): uint64 array of 256 masks, bit j of the mask of c is set when pat[j] is c
+    m (int): Length of the pattern
+
+    Returns:
+    np.ndarray: int64 array of the 1 based positions where the pattern occurs
+
+    Note:
+    - Keeps the branch on the match bit, writing every position and advancing by the bit is
+      only faster when most positions are matches, typical patterns rarely match so the
+      branch is well predicted
+    """
+    n = len(text_arr)
+    state = np.uint64(0)
+    match_bit = np.uint64(1) << np.uint64(m - 1)
+    one = np.uint64(1)
+
+    occurrences = np.empty(max(n - m + 1, 0), np.int64)
+    count = 0
+
     # For each of the characters in the text
     for i in range(n):
-        # Populate delta by comparing each char in pattern with the current char in text
-        for j in range(m):
-            delta[j] = text[i] != pat[m-1-j]
+        # Extend every partial match by one character and start a new one at this character
+        state = ((state << one) | one) & masks[text_arr[i]]
 
-        # Perform bitwise operations using previous bitvector and current delta bit array
-        bitvector = (bitvector << 1) | delta
+        # Check if the last bit is set, if it is then it means theres a match
+        if state & match_bit:
+            occurrences[count] = (i + 1) - m + 1
+            count += 1
 
-        # Check if the first bit array is 0, if it is then it means theres a match
-        if not bitvector[0]:
-            # Append the position where the match was found
-            occurrences.append((i + 1) - m + 1)
+    return occurrences[:count]
 
-    return occurrences
 
+def shift_and_kernel(text_arr: "np.ndarray", masks: "np.ndarray", m: int) -> "np.ndarray":
+    """
+    Shift-And over a multi word state, compiled with Numba when it is installed.
+    Word w of the state holds bits w * WORD_SIZE to (w + 1) * WORD_SIZE - 1, the
+    top bit of each word is carried into the next word on every shift
 
-if __name__ == "__main__":
-    _, text_file, pat_file = sys.argv
+    Parameters:
+    text_arr (np.ndarray): uint8 array of the text
+    masks (np.ndarray): uint64 array of shape (256, number of words), bit j of the
+                        mask of c is set when pat[j] is c
+    m (int): Length of the pattern
 
-    text = read_file(text_file)
-    pat = read_file(pat_file)
-    result = bitvector_pat_match(text, pat)
+    Returns:
+    np.ndarray: int64 array of the 1 based positions where the pattern occurs
+    """
+    n = len(text_arr)
+    num_words = masks.shape[1]
+    state = np.zeros(num_words, np.uint64)
+    last_word = num_words - 1
+    match_shift = np.uint64((m - 1) % WORD_SIZE)
+    top_shift = np.uint64(WORD_SIZE - 1)
+    one = np.uint64(1)
+
+    occurrences = np.empty(max(n - m + 1, 0), np.int64)
+    count = 0
+    # Every character writes to the buffer, so it can't be empty
+    if n < m:
+        return occurrences
+
+    # For each of the characters in the text
+    for i in range(n):
+        c = text_arr[i]
+        # Carry in 1 to the lowest word to start a new match at this character
+        carry = one
+        for w in range(num_words):
+            word = state[w]
+            state[w] = ((word << one) | carry) & masks[c, w]
+            carry = word >> top_shift
+
+        # Always write the position and only keep it when the last bit is set, so there is no branch
+        occurrences[count] = (i + 1) - m + 1
+        count += np.int64((state[last_word] >> match_shift) & one)
+
+    return occurrences[:count]
+
+
+if njit is not None:
+    shift_and_kernel_64 = njit(cache=True, boundscheck=False)(shift_and_kernel_64)
+    shift_and_kernel = njit(cache=True, boundscheck=False)(shift_and_kernel)
+
+
+def bitvector_pat_match_nb(text: str | bytes | memoryview, pat: str | bytes) -> list[int]:
+    """
+    Shift-And using the Numba compiled kernels, the masks of the pattern characters
+    are stored in a 256 entry table of words so any pattern length is supported.
+    Patterns that fit in a single word use the single word kernel
+
+    Parameters:
+    text (str | bytes | memoryview): Text string to perform pattern matching on, must be ASCII
+    pat (str | bytes): Pattern string to be used to pattern match in text, must be ASCII
+
+    Returns:
+    list[int]: A list of integers that states the occurrence of the pattern
+    """
+    text_arr = np.frombuffer(to_bytes(text), np.uint8)
+    m = len(pat)
+    num_words = max((m + WORD_SIZE - 1) // WORD_SIZE, 1)
+
+    # Precompute the mask of each character, bit j is set when pat[j] is the character
+    masks = np.zeros((256, num_words), np.uint64)
+    for j, c in enumerate(to_bytes(pat)):
+        masks[c, j // WORD_SIZE] |= np.uint64(1 << (j % WORD_SIZE))
 
-    result_str = "\n".join(map(str, result))
+    if num_words == 1:
+        return shift_and_kernel_64(text_arr, masks[:, 0].copy(), m).tolist()
 
-    output_file = "output_bitvector.txt"
-    write_file(output_file, result_str)
+    return shift_and_kernel(text_arr, masks, m).tolist()
+
+
+if __name__ == "__main__":
+    run_pat_match(bitvector_pat_match, "output_bitvector.txt")
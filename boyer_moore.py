@@ -1,18 +1,179 @@
-import sys
-from tools import read_file, write_file
+from array import array
+from bisect import bisect_right
+from functools import cached_property, lru_cache
+from tools import is_ascii, read_file_mmap, run_pat_match, to_bytes
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import get_num_threads, njit, prange
+except ImportError:
+    njit = None
+    prange = range
 
 ASCII_SIZE = 128
 NAN = -1
+# Number of characters explicitly compared one at a time before switching to block comparisons
+VECTOR_CMP_MIN = 32
+# Number of candidates that can fail verification at the start before the prefilter gives up
+PREFILTER_MAX_MISSES = 16
+# Number of alignments the prefilter finds the candidates of at a time
+PREFILTER_BLOCK = 1 << 16
+# Longest pattern that is matched with Horspool, every window is compared in full
+HORSPOOL_MAX_PAT = 16
+# Longest pattern the Python main loop reads the dense bad character array of, m x |N| ints
+BAD_CHAR_DENSE_MAX = 1 << 16
+# Number of alignments of the pattern each thread of the parallel main loop checks at a time
+PARALLEL_CHUNK = 1 << 16
+# Fewest alignments left for the compiled main loop before it is split between threads
+PARALLEL_MIN_LEN = 1 << 20
+
+
+def common_prefix_length(text_arr: "np.ndarray", a: int, b: int, limit: int) -> int:
+    """
+    Count how many characters match when comparing text_arr from index a and from
+    index b, comparing blocks that double in size with NumPy so a long match takes
+    few vectorized passes and an early mismatch doesn't scan the whole array
+
+    Parameters:
+    text_arr (np.ndarray): uint8 array of the text
+    a (int): Starting index of the first substring
+    b (int): Starting index of the second substring
+    limit (int): Maximum number of characters to compare
+
+    Returns:
+    int: Length of the common prefix of the two substrings, at most limit
+    """
+    length = 0
+    block = VECTOR_CMP_MIN
+
+    while length < limit:
+        block_len = min(block, limit - length)
+        mismatch = text_arr[a + length:a + length + block_len] != text_arr[b + length:b + length + block_len]
+        # Position of the first mismatch in the block
+        if mismatch.any():
+            return length + int(mismatch.argmax())
+
+        length += block_len
+        block *= 2
+
+    return length
+
+
+def common_prefix_length_bytes(text_bytes: bytes, a: int, b: int, limit: int) -> int:
+    """
+    Count how many characters match when comparing text_bytes from index a and from
+    index b without NumPy. Blocks that double in size are compared with bytes equality,
+    which is a memcmp, then the block with the mismatch is binary searched
+
+    Parameters:
+    text_bytes (bytes): Bytes of the text
+    a (int): Starting index of the first substring
+    b (int): Starting index of the second substring
+    limit (int): Maximum number of characters to compare
+
+    Returns:
+    int: Length of the common prefix of the two substrings, at most limit
+    """
+    length = 0
+    block = VECTOR_CMP_MIN
+
+    while length < limit:
+        block_len = min(block, limit - length)
+        first = text_bytes[a + length:a + length + block_len]
+        second = text_bytes[b + length:b + length + block_len]
+
+        if first != second:
+            # first[:lo] == second[:lo] and first[:hi] != second[:hi], narrow down to the mismatch
+            lo = 0
+            hi = block_len
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if first[lo:mid] == second[lo:mid]:
+                    lo = mid
+                else:
+                    hi = mid
+            return length + lo
+
+        length += block_len
+        block *= 2
+
+    return length
+
+
+def z_algorithm_kernel(text_arr: "np.ndarray") -> "np.ndarray":
+    """
+    Z algorithm on a uint8 array, compiled with Numba when it is installed so the
+    explicit comparisons run on the bytes without going through the interpreter
+
+    Parameters:
+    text_arr (np.ndarray): uint8 array of the string, must not be empty
+
+    Returns:
+    np.ndarray: int32 Z array of the string, same values as z_algorithm
+    """
+    # Left and right pointers of Z algorithm
+    l = 0
+    r = 0
+    n = len(text_arr)
+
+    z_array = np.zeros(n, np.int32)
+    z_array[0] = NAN
+
+    for i in range(1, n):
+        z = 0
+        # If current iteration is inside rightmost Z box
+        if i <= r:
+            offset_i_zbox = z_array[i - l]
+            remaining_length = r - i + 1
+
+            # If the offset z box is 0 then just skip
+            if offset_i_zbox == 0:
+                continue
+
+            # Case 1: if offset Z box value < remaining length of current Z box
+            if offset_i_zbox < remaining_length:
+                z_array[i] = offset_i_zbox
+                continue
+            # Case 2: if offset Z box value == remaining length of current Z box
+            elif offset_i_zbox == remaining_length:
+                # Perform explicit comparison starting at r + 1, comparing with r + 1 - i
+                z = offset_i_zbox
+            # Case 3: if offset Z box value > remaining length
+            else:
+                z_array[i] = remaining_length
+                continue
+
+        # Explicitly comparing character from starting point until the end of the string
+        while i + z < n and text_arr[z] == text_arr[i + z]:
+            z += 1
+        z_array[i] = z
+
+        # Update l and r if current iteration has a bigger rightmost box and z array value is not 0
+        if z and i + z > r:
+            r = i + z - 1
+            l = i
+
+    return z_array
+
 
+if njit is not None:
+    z_algorithm_kernel = njit(cache=True, boundscheck=False)(z_algorithm_kernel)
 
-def z_algorithm(text: str) -> list[int]:
+
+def z_algorithm(text: str | bytes, reverse: bool = False) -> list[int]:
     """
     Applying Z algorithm to a string. Computes the Z array of a string
     efficiently and computes the Z array of a string and returns the 
     length of the longest substring that matches the prefix
 
     Parameters:
-    text (str): String to perform z algorithm on
+    text (str | bytes): String to perform z algorithm on
+    reverse (bool): Compute the Z array of the reversed string instead, a str is
+                    read backwards so no reversed copy of it is made
 
     Returns:
     list[int]: A list containing the length of longest match of 
@@ -20,17 +181,47 @@ def z_algorithm(text: str) -> list[int]:
 
     Note:
     - Z array is computed in linear time O(n) where n is the length of the text
+    - z_algorithm(text, reverse=True) is the same as z_algorithm(text[::-1])
+    - Explicit comparisons longer than VECTOR_CMP_MIN characters on ASCII strings are done in
+      blocks with NumPy, or with bytes comparisons when NumPy isn't installed
+    - Non empty ASCII strings are passed to z_algorithm_kernel when Numba is installed
 
 
     """
+    n = len(text)
+
+    # Compiled version on the bytes of the string, reversed with a negative stride view instead of a copy
+    if njit is not None and n and text.isascii():
+        text_arr = np.frombuffer(to_bytes(text), np.uint8)
+        if reverse:
+            text_arr = text_arr[::-1]
+        return z_algorithm_kernel(text_arr).tolist()
+
     # Left and right pointers of Z algorithm
     l = 0
     r = 0
 
-    z_array = [0] * len(text)
+    # Index k of the string being processed is index base + step * k of chars
+    chars = text
+    base, step = (n - 1, -1) if reverse else (0, 1)
+
+    # ASCII strings are compared as bytes so long explicit comparisons can be done in blocks,
+    # reversing the bytes is a single C level copy so they are read forwards
+    text_bytes = text_arr = None
+    if text.isascii():
+        chars = text_bytes = to_bytes(text)
+        if reverse:
+            chars = text_bytes = text_bytes[::-1]
+            base, step = 0, 1
+
+        # Vectorize the block comparisons on a uint8 view of the bytes
+        if np is not None and n > VECTOR_CMP_MIN:
+            text_arr = np.frombuffer(text_bytes, np.uint8)
+
+    z_array = [0] * n
     z_array[0] = NAN
 
-    for i in range(1, len(text)):
+    for i in range(1, n):
         # If current iteration is inside rightmost Z box
         if i <= r:
             offset_i = i - l
@@ -58,129 +249,474 @@ def z_algorithm(text: str) -> list[int]:
                 z_array[i] = remaining_length
                 continue
 
-        # Explicitly comparing character from starting point to second last character in string
-        for j in range(z_array[i], len(text) - 1):
-            if (i + z_array[i] >= len(text)):
-                break
-            if (text[j] == text[i + z_array[i]]):
-                z_array[i] += 1
+        # Explicitly comparing character from starting point until the end of the string
+        z = z_array[i]
+        stop = n - i
+        # Index of chars that the character at i + k is read from is shifted_base + step * k
+        shifted_base = base + step * i
+        # Compare one character at a time, only the first few characters when comparing bytes
+        scalar_stop = stop if text_bytes is None else min(stop, z + VECTOR_CMP_MIN)
+        while z < scalar_stop and chars[base + step * z] == chars[shifted_base + step * z]:
+            z += 1
+
+        # If there is no mismatch yet then compare the rest in blocks
+        if z == scalar_stop < stop:
+            if text_arr is not None:
+                z += common_prefix_length(text_arr, z, i + z, stop - z)
             else:
-                break
+                z += common_prefix_length_bytes(text_bytes, z, i + z, stop - z)
+        z_array[i] = z
 
         # Calculate mismatch
-        mismatch_point = i + z_array[i]
+        mismatch_point = i + z
         # Update l and r if current iteration has a bigger rightmost box and z array value is not 0
-        if z_array[i] and mismatch_point > r:
+        if z and mismatch_point > r:
             r = mismatch_point - 1
             l = i
 
     return z_array
 
 
-def extended_bad_char(pat: str) -> list[list[int]]:
+def z_algorithm_batch(pats: list[str | bytes]) -> "np.ndarray":
+    """
+    Computes the Z arrays of many patterns at once with NumPy. The patterns are
+    stacked into a k x M array padded to the longest length M, then for every offset
+    j the prefixes of all k patterns are compared with their substrings at j in a
+    single vectorized pass, instead of running Z algorithm on each pattern in Python
+
+    Parameters:
+    pats (list[str | bytes]): ASCII patterns to perform z algorithm on
+
+    Returns:
+    np.ndarray: k x M array where the first len(pats[r]) entries of row r are
+                z_algorithm(pats[r]), entries past the end of a pattern are 0
+                so the row of an empty pattern is all 0
+
+    Raises:
+    ImportError: If NumPy isn't installed
+
+    Note:
+    - Does O(k * M^2) comparisons, so it is meant for many short patterns
+    """
+    if np is None:
+        raise ImportError("z_algorithm_batch requires NumPy")
+
+    k = len(pats)
+    max_len = max(map(len, pats), default=0)
+    lengths = np.array([len(pat) for pat in pats], np.int64)
+
+    # Stack the patterns into one array, padding on the right with NUL
+    pat_arr = np.frombuffer(b"".join(to_bytes(pat).ljust(max_len, b"\0") for pat in pats), np.uint8)
+    pat_arr = pat_arr.reshape(k, max_len)
+
+    z_arrays = np.zeros((k, max_len), np.int64)
+    # First value of every non empty Z array is NAN like z_algorithm
+    if max_len:
+        z_arrays[lengths > 0, 0] = NAN
+
+    for j in range(1, max_len):
+        # Compare the prefix of every pattern with its substring starting at j, ignoring the padding
+        match = pat_arr[:, :max_len - j] == pat_arr[:, j:]
+        match &= np.arange(j, max_len) < lengths[:, None]
+        # Length of the prefix that matches is the number of leading matches
+        z_arrays[:, j] = np.logical_and.accumulate(match, axis=1).sum(axis=1)
+
+    return z_arrays
+
+
+def reversed_preprocess_kernel(pat_arr: "np.ndarray", pat_rev_arr: "np.ndarray"
+                               ) -> tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Build every table reversed_bm_kernel needs in one call, compiled with Numba when
+    it is installed. Z arrays are computed on the bytes once in each direction and the
+    tables are written as contiguous int32 arrays without going through Python lists
+
+    Parameters:
+    pat_arr (np.ndarray): uint8 array of the pattern, must not be empty and must only
+                          contain ASCII characters
+    pat_rev_arr (np.ndarray): uint8 array of the reversed pattern
+
+    Returns:
+    tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The bad character row pointers and
+                                                           positions, reversed good "prefix" and
+                                                           reversed matched prefix arrays
+
+    Note:
+    - Instead of the m x |N| reversed extended bad character array, the positions of each
+      character are stored in increasing order, positions of c are in bad_char_pos from
+      bad_char_ptr[c] to bad_char_ptr[c + 1], so both take O(m + |N|) space
+    """
+    m = len(pat_arr)
+    z_array = z_algorithm_kernel(pat_arr)
+    z_reversed_array = z_algorithm_kernel(pat_rev_arr)
+
+    # Count the occurrences of each character, then sum them into the start of each row
+    bad_char_ptr = np.zeros(ASCII_SIZE + 1, np.int32)
+    for i in range(m):
+        bad_char_ptr[pat_arr[i] + 1] += 1
+    for c in range(ASCII_SIZE):
+        bad_char_ptr[c + 1] += bad_char_ptr[c]
+
+    # Write each position at the end of the row of its character so far, keeping the rows sorted
+    bad_char_pos = np.empty(m, np.int32)
+    row_end = bad_char_ptr[:ASCII_SIZE].copy()
+    for i in range(m):
+        bad_char_pos[row_end[pat_arr[i]]] = i
+        row_end[pat_arr[i]] += 1
+
+    # Reversed good "prefix", from last character to second character in pat
+    good_prefix = np.full(m + 1, NAN, np.int32)
+    for i in range(m - 1, 0, -1):
+        good_prefix[z_array[i]] = m - 1 - i
+
+    # Reversed matched prefix, the largest prefix that matches the suffix will be on the right
+    reversed_mp_arr = np.zeros(m + 1, np.int32)
+    for k in range(1, m + 1):
+        if z_reversed_array[m - k] == k:
+            reversed_mp_arr[k] = k
+        else:
+            reversed_mp_arr[k] = reversed_mp_arr[k - 1]
+    reversed_mp_arr[m] = m
+
+    return bad_char_ptr, bad_char_pos, good_prefix, reversed_mp_arr
+
+
+if njit is not None:
+    reversed_preprocess_kernel = njit(cache=True, boundscheck=False)(reversed_preprocess_kernel)
+
+
+def reversed_bad_char_query(bad_char_ptr: "np.ndarray", bad_char_pos: "np.ndarray", i: int, c: int) -> int:
+    """
+    Find the reversed extended bad character index of character c at position i of the
+    pattern with a galloping search of the positions of c, compiled with Numba when it is installed
+
+    Parameters:
+    bad_char_ptr (np.ndarray): Start of the positions of each character in bad_char_pos
+    bad_char_pos (np.ndarray): Positions of each character of the pattern in increasing order
+    i (int): Position of the mismatch in the pattern
+    c (int): Code of the mismatched character in the text
+
+    Returns:
+    int: Right leftmost occurrence of c after i as an index of the reversed pattern, NAN if there is none
+
+    Note:
+    - The pattern is scanned from the left so most mismatches are near the start of it, the
+      search doubles its step from the first position of c and costs O(log k) for the k
+      positions of c up to i, instead of O(log m)
+    """
+    m = len(bad_char_pos)
+    lo = bad_char_ptr[c]
+    end = bad_char_ptr[c + 1]
+
+    # Double the step until a position after i is passed, every position before lo is up to i
+    step = 1
+    probe = lo
+    while probe < end and bad_char_pos[probe] <= i:
+        lo = probe + 1
+        step *= 2
+        probe = lo + step - 1
+
+    # Find the first position of c that is after i, between lo and the probe
+    hi = min(probe + 1, end)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if bad_char_pos[mid] <= i:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    if lo == end:
+        return NAN
+
+    return m - 1 - bad_char_pos[lo]
+
+
+if njit is not None:
+    reversed_bad_char_query = njit(cache=True, boundscheck=False)(reversed_bad_char_query)
+
+
+class BMTables:
+    """
+    Preprocessing tables of a pattern for Boyer Moore in both directions. The Z array
+    of the pattern and the Z array of the reversed pattern are each computed at most
+    once and shared by every table derived from them, each table is only built the
+    first time it is accessed
+
+    Note:
+    - The forward Z array gives the reversed good suffix and matched prefix arrays,
+      the reversed Z array gives the good suffix and reversed matched prefix arrays
+    - Tables are int arrays so each entry takes 4 bytes instead of a pointer to an int object,
+      Z arrays are stored as int arrays too since the tables only read each entry once
+    """
+
+    def __init__(self, pat: str | bytes) -> None:
+        """
+        Parameters:
+        pat (str | bytes): Pattern to create the preprocessing tables for
+        """
+        self.pat = pat
+        self.m = len(pat)
+
+    @cached_property
+    def pat_bytes(self) -> bytes:
+        """Bytes of the pattern, encoded once for every table"""
+        return to_bytes(self.pat)
+
+    @cached_property
+    def pat_rev(self) -> bytes:
+        """Bytes of the reversed pattern, reversed once for every table that reads the pattern backwards"""
+        return self.pat_bytes[::-1]
+
+    @cached_property
+    def z_fwd(self) -> array:
+        """Z array of the pattern"""
+        return array('i', z_algorithm(self.pat))
+
+    @cached_property
+    def z_rev(self) -> array:
+        """Z array of the reversed pattern"""
+        # Patterns that can't be encoded to bytes are read backwards instead
+        if not self.pat.isascii():
+            return array('i', z_algorithm(self.pat, reverse=True))
+
+        return array('i', z_algorithm(self.pat_rev))
+
+    @cached_property
+    def extended_bad_char(self) -> array:
+        """Flat extended bad character array, see extended_bad_char"""
+        m = self.m
+        pat_bytes = self.pat_bytes
+        num_of_char = ASCII_SIZE
+        ext_bad_char_arr = array('i', [NAN]) * (max(m, 1) * num_of_char)
+
+        # Start from the second char of pat
+        for i in range(1, m):
+            row = i * num_of_char
+            # Copy the previous row into the row of the current position
+            ext_bad_char_arr[row:row + num_of_char] = ext_bad_char_arr[row - num_of_char:row]
+            # Set the position of the character in the previous location to the previous location
+            ext_bad_char_arr[row + pat_bytes[i - 1]] = i - 1
+
+        return ext_bad_char_arr
+
+    @cached_property
+    def reversed_ext_bad_char(self) -> array:
+        """Flat reversed extended bad character array, see reversed_ext_bad_char"""
+        m = self.m
+        pat_bytes = self.pat_bytes
+        num_of_char = ASCII_SIZE
+        reversed_bad_char_arr = array('i', [NAN]) * (max(m, 1) * num_of_char)
+
+        # Start from the second last char of pat, going to the left
+        for i in range(m - 2, -1, -1):
+            row = i * num_of_char
+            # Copy the row of the next position into the row of the current position
+            reversed_bad_char_arr[row:row + num_of_char] = reversed_bad_char_arr[row + num_of_char:row + 2 * num_of_char]
+            # Set the character on the right to its position in the reversed pat
+            reversed_bad_char_arr[row + pat_bytes[i + 1]] = m - 2 - i
+
+        return reversed_bad_char_arr
+
+    @cached_property
+    def reversed_tables_np(self) -> tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Reversed bad character positions, good "prefix" and matched prefix arrays, see reversed_preprocess_kernel"""
+        return reversed_preprocess_kernel(np.frombuffer(self.pat_bytes, np.uint8), np.frombuffer(self.pat_rev, np.uint8))
+
+    @cached_property
+    def reversed_bad_char_positions(self) -> dict[str | int, list[int]]:
+        """
+        Positions of each character of the pattern in increasing order, the reversed extended
+        bad character index of c at i is m - 1 minus the first position of c after i
+        """
+        positions = {}
+        for i, c in enumerate(self.pat):
+            positions.setdefault(c, []).append(i)
+        return positions
+
+    @cached_property
+    def good_suffix(self) -> array:
+        """Good suffix array, see good_suffix"""
+        # Z array of the reversed pattern, z suffix value of i is at m - 1 - i
+        z_reversed_array = self.z_rev
+        m = self.m
+        good_suffix = array('i', [NAN]) * (m + 1)
+
+        # From first character to second last character in pat
+        for i in range(m - 1):
+
+            j = m - z_reversed_array[m - 1 - i]
+            good_suffix[j] = i
+
+        return good_suffix
+
+    @cached_property
+    def reversed_good_suffix(self) -> array:
+        """Reversed good "prefix" array, see reversed_good_suffix"""
+        z_array = self.z_fwd
+        m = self.m
+        good_prefix = array('i', [NAN]) * (m + 1)
+
+        # From last character to second character in pat, same order as good suffix on the reversed pat
+        for i in range(m - 1, 0, -1):
+            good_prefix[z_array[i]] = m - 1 - i
+
+        return good_prefix
+
+    @cached_property
+    def matched_prefix(self) -> array:
+        """Matched prefix array, see matched_prefix"""
+        z_matched_array = self.z_fwd
+        m = self.m
+
+        # Create matched prefix array with m + 1 size, the m + 1 index stores the info on shift when
+        # first index of pat unmatch with text
+        matched_prefix_arr = array('i', [0]) * (m+1)
+
+        # Find the largest suffix that matches the prefix, loops from back to front, largest suffix will be on the left
+        for i in range(m-1, -1, -1):
+            # If the z box reaches the end of the string, meaning matched prefix
+            if i + z_matched_array[i] == m:
+                matched_prefix_arr[i] = z_matched_array[i]
+
+            else:
+                matched_prefix_arr[i] = matched_prefix_arr[i+1]
+
+        # First index of matched prefix is always length of string
+        matched_prefix_arr[0] = m
+
+        return matched_prefix_arr
+
+    @cached_property
+    def reversed_matched_prefix(self) -> array:
+        """Reversed matched prefix array, see reversed_matched_prefix"""
+        z_reversed_array = self.z_rev
+        m = self.m
+
+        # Index 0 stores the info on shift when the last index of pat unmatch with text
+        reversed_mp_arr = array('i', [0]) * (m + 1)
+
+        # Find the largest prefix that matches the suffix, loops from front to back, largest prefix will be on the right
+        for k in range(1, m + 1):
+            # If the z box of the reversed pattern reaches the start of the string, meaning matched prefix
+            if z_reversed_array[m - k] == k:
+                reversed_mp_arr[k] = k
+
+            else:
+                reversed_mp_arr[k] = reversed_mp_arr[k - 1]
+
+        # Last index of reversed matched prefix is always length of string
+        reversed_mp_arr[m] = m
+
+        return reversed_mp_arr
+
+
+@lru_cache(maxsize=128)
+def bm_tables(pat: str | bytes) -> BMTables:
+    """
+    Get the preprocessing tables of a pattern, the BMTables of the 128 most recently
+    used patterns are kept, so matching with the same pattern again reuses every
+    table that has already been built
+
+    Parameters:
+    pat (str | bytes): Pattern to get the preprocessing tables for
+
+    Returns:
+    BMTables: Tables of the pattern, shared between calls so they must not be modified
+
+    Note:
+    - The functions returning a single table still build a new one on every call, since
+      the caller is free to modify it
+    - Only tables of O(m) ints should be read from the cached tables, the dense bad character
+      arrays take m x |N| ints so they are built again for every search with reversed_ext_bad_char
+    """
+    return BMTables(pat)
+
+
+def extended_bad_char(pat: str | bytes) -> array:
     """
     Extended version of the bad character rule, using a 2-D array of |N| x m
     where N is the constant number of ASCII characters and m is the size of the
-    pattern.
-    For every character in the pattern, we copy the previous 1-D array of length |N| and
-    change the corresponding character in the array to current index
+    pattern, stored row by row in a single flat int array.
+    For every character in the pattern, we copy the previous row of length |N| and
+    change the corresponding character in the row to current index
 
     Parameters:
-    pat (str): pattern to create extended bad character array for
+    pat (str | bytes): pattern to create extended bad character array for
 
     Returns:
-    list[list[int]]: 2-D array of the left rightmost occurrence of each constant number of 
-                     ASCII characters
+    array: Flat 2-D array of the left rightmost occurrence of each constant number of 
+           ASCII characters, entry for position i and character c is at i * |N| + ord(c)
 
     Note:
     - Complexity of O(m * |N|): m is the size of the pattern and |N| is the constant number
       of ASCII characters existing, however, since |N| is a constant size, we can omit treat
       it as constant time therefore O(m * 1) = O(m)
+    - Rows are copied with slice assignment, which is a single memmove of |N| ints
+    - The characters of pat are read from its bytes, so each one is a byte load instead of an ord call
     """
-    num_of_char = ASCII_SIZE
-    ext_bad_char_arr = [[NAN] * num_of_char]
+    return BMTables(pat).extended_bad_char
 
-    # Start from the second char of pat
-    for i in range(1, len(pat)):
-        bad_char_for_i = ext_bad_char_arr[i - 1].copy()
-        # Set the position of the character in the previous location to the previous location
-        bad_char_for_i[ord(pat[i - 1])] = i - 1
-        # Populate the 2-D bad character array
-        ext_bad_char_arr.append(bad_char_for_i)
 
-    return ext_bad_char_arr
-
-
-def reversed_ext_bad_char(pat: str) -> list[int]:
+def reversed_ext_bad_char(pat: str | bytes) -> array:
     """
     Applying the reversed version of bad character, the suffix of a
-    string is now the prefix, then reverse the reversed bad char arr
-    back, since our pat will be matched in the normal direction.
+    string is now the prefix. The rows are built from the last character
+    of pat to the first, so they are already in the normal direction
+    since our pat will be matched in the normal direction.
 
     Parameters:
-    pat (str): Pattern to apply reversed version of bad character
+    pat (str | bytes): Pattern to apply reversed version of bad character
 
     Returns:
-    list[int]: Bad character array with reversed index
+    array: Flat bad character array with reversed index, laid out like extended_bad_char
 
     Note:
     - When accessing the bad char array with reversed index = len(pat) - 1 - bc[mismatch][char] - mismatch
     - Instead of mismatch - bc index, reverse does it by bc index - mismatch, since now we need the right-leftmost 
       occ of mismatch char instead of left-rightmost occ
     """
-    reversed_bad_char_arr = extended_bad_char(pat[::-1])
-    return reversed_bad_char_arr[::-1]
+    return BMTables(pat).reversed_ext_bad_char
 
 
-def good_suffix(pat: str) -> list[int]:
+def good_suffix(pat: str | bytes) -> array:
     """
     Applying the good suffix rule to the pattern where it will produce a 
     good suffix array which contains information on the longest substring 
     that matches the prefix
 
     Parameters:
-    pat (str): Pattern string to apply good suffix on
+    pat (str | bytes): Pattern string to apply good suffix on
 
     Returns:
-    list[int]: A good suffix array
+    array: A good suffix array
 
     Note:
     - Complexity of O(m) where m is the pattern size
     """
-    # Pass reverse pattern into z algorithm to get z suffix array
-    z_suffix_array = z_algorithm(pat[::-1])[::-1]
-    m = len(pat)
-    good_suffix = [NAN] * (m + 1)
-
-    # From first character to second last character in pat
-    for i in range(m - 1):
-
-        j = m - z_suffix_array[i]
-        good_suffix[j] = i
+    return BMTables(pat).good_suffix
 
-    return good_suffix
 
-
-def reversed_good_suffix(pat: str) -> list[int]:
+def reversed_good_suffix(pat: str | bytes) -> array:
     """
     Applying good suffix on a reversed pattern. Essentially finding the good prefix
-    of the pattern, then reverse and return the result. Will be used on the implementation
+    of the pattern, written directly in reversed index order. Will be used on the implementation
     of reversed Boyer Moore algorithm
 
     Parameters:
-    pat (str): Pattern string to find good "prefix"
+    pat (str | bytes): Pattern string to find good "prefix"
 
     Returns:
-    list[int]: Reversed good "prefix" array
+    array: Reversed good "prefix" array
 
     Note:
     - When accessing the reversed good suffix array len(pat) - 1 - goodsuffix(mismatch - 1)
+    - The z suffix array of the reversed pattern is the Z array of the pattern, so no reversal
+      of the pattern or the result is needed
     """
-    good_prefix = good_suffix(pat[::-1])
-    return good_prefix[::-1]
+    return BMTables(pat).reversed_good_suffix
 
 
-def matched_prefix(pat: str) -> list[int]:
+def matched_prefix(pat: str | bytes) -> array:
     """
     Applying matched prefix to pattern preprocessing, find the longest suffix that matches the
     prefix of pattern. The first index of the matched prefix array will always to the size of
@@ -189,61 +725,394 @@ def matched_prefix(pat: str) -> list[int]:
     suffix that matches the prefix of given pattern
 
     Parameter:
-    pat (str): Pattern string to apply matched prefix on
+    pat (str | bytes): Pattern string to apply matched prefix on
 
     Returns:
-    list[int]: A list of integer containing the length of the longest suffix that matches prefix
+    array: An int array containing the length of the longest suffix that matches prefix
 
     Note:
     - Require O(m) time complexity. Applies Z algorithm which takes O(m) time and process the z array
       to obtain the matched prefix array O(m), O(m + m) = O(2m) = O(m)
     """
-    # Apply Z algorithm
-    z_matched_array = z_algorithm(pat)
-    m = len(pat)
+    return BMTables(pat).matched_prefix
 
-    # Create matched prefix array with m + 1 size, the m + 1 index stores the info on shift when
-    # first index of pat unmatch with text
-    matched_prefix_arr = [0] * (m+1)
 
-    # Find the largest suffix that matches the prefix, loops from back to front, largest suffix will be on the left
-    for i in range(m-1, -1, -1):
-        # If the z box reaches the end of the string, meaning matched prefix
-        if i + z_matched_array[i] == m:
-            matched_prefix_arr[i] = z_matched_array[i]
+def reversed_matched_prefix(pat: str | bytes) -> array:
+    """
+    Applying matched prefix rule in reversed. To be used in the reverse implementation
+    of Boyer Moore. The suffix of the string is now the prefix, vice versa. Apply Z algorithm
+    on the reversed pattern then fill the matched prefix array from the front so that it
+    matches the original pattern indexes
 
-        else:
-            matched_prefix_arr[i] = matched_prefix_arr[i+1]
+    Parameters:
+    pat (str | bytes): Pattern string that reversed matched prefix is applied on
 
-    # First index of matched prefix is always length of string
-    matched_prefix_arr[0] = m
+    Returns:
+    array: An int array containing the largest suffix that matches prefix in the reversed direction
 
-    return matched_prefix_arr
+    Note:
+    - When accessing reversed matched prefix array len(pat) - matchedprefix(mismatch)
+    - Since matchedprefix is reversed when returned, m + 1 will now be 0, so if mismatch occurs at 
+      position 0 then we want to take m + 1, thus matchedprefix(0)
+    """
+    return BMTables(pat).reversed_matched_prefix
 
 
-def reversed_matched_prefix(pat: str) -> list[int]:
+def pair_prefilter(text_bytes: bytes | memoryview, pat_bytes: bytes) -> tuple[list[int], int]:
     """
-    Applying matched prefix rule in reversed. To be used in the reverse implementation
-    of Boyer Moore. The suffix of the string is now the prefix, vice versa. Input the 
-    reversed pattern into the original matched prefix function then reversed the output
-    so that it matches the original pattern indexes
+    Find occurrences of the pattern by only verifying the alignments where the first
+    and the last character of the pattern both match the text. Going from the right of
+    the text to the left, the candidates of each block of PREFILTER_BLOCK alignments are
+    found with two vectorized comparisons in NumPy and each one is verified with a bytes
+    comparison. When too many candidates aren't occurrences the rest of the text is left
+    for Boyer Moore, so giving up early also stops the vectorized comparisons
 
     Parameters:
-    pat (str): Pattern string that reversed matched prefix is applied on
+    text_bytes (bytes | memoryview): Bytes of the text
+    pat_bytes (bytes): Bytes of the pattern, must not be longer than the text or empty
 
     Returns:
-    list[int]: A list of int containing the largest suffix that matches prefix in the reversed direction
+    tuple[list[int], int]: Occurrences found in decreasing order, and the index of the text
+                           that the rightmost alignment left for Boyer Moore ends at, NAN if
+                           every alignment has been checked
 
     Note:
-    - When accessing reversed matched prefix array len(pat) - matchedprefix(mismatch)
-    - Since matchedprefix is reversed when returned, m + 1 will now be 0, so if mismatch occurs at 
-      position 0 then we want to take m + 1, thus matchedprefix(0)
+    - Boyer Moore shifts by at most m, so it needs at least one iteration for every m
+      alignments. Once the failed candidates outnumber that plus PREFILTER_MAX_MISSES, the
+      first and last characters are too common in the text for the prefilter to be faster
+    """
+    n = len(text_bytes)
+    m = len(pat_bytes)
+    text_arr = np.frombuffer(text_bytes, np.uint8)
+
+    num_alignments = n - m + 1
+    first = pat_bytes[0]
+    last = pat_bytes[-1]
+
+    occurrence = []
+    misses = 0
+
+    # For each block of alignments starting from the rightmost one
+    for hi in range(num_alignments, 0, -PREFILTER_BLOCK):
+        lo = max(hi - PREFILTER_BLOCK, 0)
+
+        # Alignments of the block where the first and the last character of pat match the text
+        pair_match = text_arr[lo:hi] == first
+        pair_match &= text_arr[lo + m - 1:hi + m - 1] == last
+        candidates = np.flatnonzero(pair_match) + lo
+
+        # Verify the candidates starting from the rightmost one
+        for search_index_on_text in candidates[::-1].tolist():
+            if text_bytes[search_index_on_text:search_index_on_text + m] == pat_bytes:
+                occurrence.append(search_index_on_text + 1)
+                continue
+
+            misses += 1
+            # Every alignment right of this one is done, continue from the alignment on its left
+            if misses > PREFILTER_MAX_MISSES + (num_alignments - search_index_on_text) // m:
+                return occurrence, search_index_on_text + m - 2
+
+    return occurrence, NAN
+
+
+def reversed_horspool(text_bytes: bytes | memoryview, pat_bytes: bytes, i: int) -> list[int]:
+    """
+    Reversed Horspool algorithm for short patterns. The window moves from right to left
+    and only uses the bad character shift of the text character under the first character
+    of pat, each window is checked with a single bytes comparison instead of one character
+    at a time
+
+    Parameters:
+    text_bytes (bytes | memoryview): Bytes of the text
+    pat_bytes (bytes): Bytes of the pattern, must not be empty
+    i (int): Index of the text that the rightmost alignment to check ends at
+
+    Returns:
+    list[int]: A list of integers that contains indices where pattern is found in text, in decreasing order
+
+    Note:
+    - O(n * m) in the worst case, but every window is compared with a memcmp so it is only
+      used for patterns of up to HORSPOOL_MAX_PAT characters
+    """
+    m = len(pat_bytes)
+
+    # Shift for the character under pat[0], the leftmost occurrence of it in pat[1:] or m if there is none
+    shift = [m] * 256
+    for j in range(m - 1, 0, -1):
+        shift[pat_bytes[j]] = j
+
+    occurrence = []
+
+    search_index_on_text = i - (m - 1)
+    while search_index_on_text >= 0:
+        if text_bytes[search_index_on_text:search_index_on_text + m] == pat_bytes:
+            occurrence.append(search_index_on_text + 1)
+
+        search_index_on_text -= shift[text_bytes[search_index_on_text]]
+
+    return occurrence
+
+
+def horspool_kernel(text_arr: "np.ndarray", pat_arr: "np.ndarray", shift: "np.ndarray") -> "np.ndarray":
+    """
+    Main loop of boyer_moore_horspool_forward on uint8 arrays, compiled with Numba when
+    it is installed. The last character of the window is checked first and the rest of
+    the window is only compared when it matches
+
+    Parameters:
+    text_arr (np.ndarray): uint8 array of the text
+    pat_arr (np.ndarray): uint8 array of the pattern, must not be empty
+    shift (np.ndarray): int64 array of 256 shifts for the character under the last character of pat
+
+    Returns:
+    np.ndarray: int64 array of the 1 based positions where the pattern occurs, in increasing order
+    """
+    n = len(text_arr)
+    m = len(pat_arr)
+    last = pat_arr[m - 1]
+
+    occurrence = np.empty(max(n - m + 1, 0), np.int64)
+    count = 0
+
+    search_index_on_text = 0
+    while search_index_on_text <= n - m:
+        c = text_arr[search_index_on_text + m - 1]
+        if c == last:
+            # Compare the rest of the window from left to right
+            j = 0
+            while j < m - 1 and text_arr[search_index_on_text + j] == pat_arr[j]:
+                j += 1
+
+            if j == m - 1:
+                occurrence[count] = search_index_on_text + 1
+                count += 1
+
+        search_index_on_text += shift[c]
+
+    return occurrence[:count]
+
+
+if njit is not None:
+    horspool_kernel = njit(cache=True, boundscheck=False)(horspool_kernel)
+
+
+def boyer_moore_horspool_forward(text_bytes: bytes | memoryview, pat_bytes: bytes) -> list[int]:
+    """
+    Horspool algorithm scanning the text from left to right. Only uses the bad character
+    shift of the text character under the last character of pat, so the text is read in
+    the same direction it is stored in memory. Uses horspool_kernel when Numba is installed,
+    otherwise each window is checked with a single bytes comparison
+
+    Parameters:
+    text_bytes (bytes | memoryview): Bytes of the text
+    pat_bytes (bytes): Bytes of the pattern, must not be empty
+
+    Returns:
+    list[int]: A list of integers that contains indices where pattern is found in text, in increasing order
+
+    Note:
+    - The shift of c is m - 1 minus the rightmost occurrence of c in pat[:-1], which is row m - 1
+      of extended_bad_char, it is built directly so the rest of the table isn't computed
+    - O(n * m) in the worst case, so it is only used for patterns of up to HORSPOOL_MAX_PAT characters
+    """
+    n = len(text_bytes)
+    m = len(pat_bytes)
+
+    # Shift for the character under pat[m - 1], m if it doesn't occur in pat[:-1]
+    shift = [m] * 256
+    for j in range(m - 1):
+        shift[pat_bytes[j]] = m - 1 - j
+
+    if njit is not None:
+        return horspool_kernel(np.frombuffer(text_bytes, np.uint8), np.frombuffer(pat_bytes, np.uint8),
+                               np.array(shift, np.int64)).tolist()
+
+    occurrence = []
+
+    search_index_on_text = 0
+    while search_index_on_text <= n - m:
+        if text_bytes[search_index_on_text:search_index_on_text + m] == pat_bytes:
+            occurrence.append(search_index_on_text + 1)
+
+        search_index_on_text += shift[text_bytes[search_index_on_text + m - 1]]
+
+    return occurrence
+
+
+def reversed_bm_kernel(text_arr: "np.ndarray", pat_arr: "np.ndarray", bad_char_ptr: "np.ndarray",
+                       bad_char_pos: "np.ndarray", good_suffix_arr: "np.ndarray",
+                       matched_prefix_arr: "np.ndarray", i: int) -> "np.ndarray":
+    """
+    Main loop of reversed_boyer_moore on uint8 arrays, compiled with Numba when it is
+    installed. Same shifts and optimizations as reversed_boyer_moore, the mismatched
+    character is read from the text as a byte and looked up with reversed_bad_char_query
+
+    Parameters:
+    text_arr (np.ndarray): uint8 array of the text, must only contain ASCII characters
+    pat_arr (np.ndarray): uint8 array of the pattern, must not be empty
+    bad_char_ptr (np.ndarray): Start of the positions of each character in bad_char_pos
+    bad_char_pos (np.ndarray): Positions of each character of the pattern in increasing order
+    good_suffix_arr (np.ndarray): Reversed good "prefix" array
+    matched_prefix_arr (np.ndarray): Reversed matched prefix array
+    i (int): Index of the text that the rightmost alignment to check ends at
+
+    Returns:
+    np.ndarray: int64 array of the 1 based positions where the pattern occurs, in decreasing order
+    """
+    m = len(pat_arr)
+
+    occurrence = np.empty(max(i - m + 2, 0), np.int64)
+    count = 0
+
+    start = stop = NAN
+    while True:
+        # Get the index of the text relative to the left most index of pat
+        search_index_on_text = i - (m - 1)
+        # If the index is negative means that pattern exceeded the text
+        if search_index_on_text < 0:
+            break
+
+        # Set text and pattern pointer
+        pattern_pointer = 0
+
+        # Loop to check pattern with text and perform shifts
+        while True:
+            if pattern_pointer == start:
+                pattern_pointer = stop + 1
+
+            # Skipping the range that is known to match can go past the end of pat
+            if pattern_pointer >= m:
+                occurrence[count] = search_index_on_text + 1
+                count += 1
+                shift_amt = m - matched_prefix_arr[m - 1]
+
+                # Optimization for matched prefix, if there's a matched prefix then optimize
+                if matched_prefix_arr[m - 1] != 0:
+                    start = shift_amt
+                    stop = m - 1
+                else:
+                    start = stop = NAN
+
+                # Perform shift
+                i -= shift_amt
+                break
+
+            # If the text and pat char is the same then check next char in pat and text
+            char_mismatch = text_arr[search_index_on_text + pattern_pointer]
+            if char_mismatch == pat_arr[pattern_pointer]:
+                pattern_pointer += 1
+                continue
+
+            # If not the same perform shifts
+            bc_index = reversed_bad_char_query(bad_char_ptr, bad_char_pos, pattern_pointer, char_mismatch)
+            # Calculate bad character shift, using length of pat to minus bc_index to reverse index
+            bc_shift = m - 1 - bc_index - pattern_pointer
+
+            if good_suffix_arr[pattern_pointer] == NAN:
+                # Use matched prefix when good suffix is NAN
+                gs_shift = m - matched_prefix_arr[pattern_pointer]
+            else:
+                gs_shift = m - 1 - good_suffix_arr[pattern_pointer]
+
+            # Compare the shifts once, the larger one is selected with a mask instead of a branch
+            bc_larger = bc_shift > gs_shift
+            same_shift = bc_shift == gs_shift
+            shift_amt = gs_shift ^ ((bc_shift ^ gs_shift) & -np.int64(bc_larger))
+
+            # Optimization, same choice of shift as reversed_boyer_moore
+            if (pattern_pointer == 0 and same_shift) or bc_larger:
+                # If the bad character index is NAN then reset start, stop. Cant optimize
+                if bc_index == NAN:
+                    start = stop = NAN
+                else:
+                    start = stop = m - 1 - bc_index
+
+            # Choosing good suffix shift, if prefix length before mismatch != 0 then optimization can be applied
+            elif pattern_pointer != 0:
+                # Match prefix shift is used, set start to gs shift value and stop to end of string
+                if good_suffix_arr[pattern_pointer] == NAN:
+                    start = gs_shift
+                    stop = m - 1
+                # Good suffix shift is used, set start to gs shift value and stop to start + length of good "prefix"
+                else:
+                    start = gs_shift
+                    stop = start + pattern_pointer - 1
+                    # If shift for bc and gs are the same then we optimize the bad character by adding 1
+                    if same_shift:
+                        stop += 1
+            else:
+                start = stop = NAN
+            # Perform shift
+            i -= shift_amt
+            break
+
+    return occurrence[:count]
+
+
+if njit is not None:
+    reversed_bm_kernel = njit(cache=True, boundscheck=False)(reversed_bm_kernel)
+
+
+def parallel_bm_kernel(text_arr: "np.ndarray", pat_arr: "np.ndarray", bad_char_ptr: "np.ndarray",
+                       bad_char_pos: "np.ndarray", good_suffix_arr: "np.ndarray",
+                       matched_prefix_arr: "np.ndarray", i: int, chunk_size: int) -> "np.ndarray":
     """
-    reversed_mp_arr = matched_prefix(pat[::-1])
-    return reversed_mp_arr[::-1]
+    Run reversed_bm_kernel on chunks of chunk_size alignments in parallel, compiled with
+    Numba when it is installed. Each chunk reads the m - 1 characters after its last
+    alignment, so a match across the boundary of two chunks is found by the left one
+
+    Parameters:
+    text_arr (np.ndarray): uint8 array of the text, must only contain ASCII characters
+    pat_arr (np.ndarray): uint8 array of the pattern, must not be empty
+    bad_char_ptr (np.ndarray): Start of the positions of each character in bad_char_pos
+    bad_char_pos (np.ndarray): Positions of each character of the pattern in increasing order
+    good_suffix_arr (np.ndarray): Reversed good "prefix" array
+    matched_prefix_arr (np.ndarray): Reversed matched prefix array
+    i (int): Index of the text that the rightmost alignment to check ends at
+    chunk_size (int): Number of alignments in each chunk
+
+    Returns:
+    np.ndarray: int64 array of the 1 based positions where the pattern occurs, in decreasing order
+
+    Note:
+    - Every alignment is in exactly one chunk, so no occurrence is found twice
+    - Chunk k writes its occurrences at the start of its own part of the buffer, the parts
+      are then copied together from the rightmost chunk to the leftmost
+    """
+    m = len(pat_arr)
+    num_alignments = max(i - m + 2, 0)
+    num_chunks = (num_alignments + chunk_size - 1) // chunk_size
+
+    occurrence = np.empty(num_alignments, np.int64)
+    counts = np.zeros(num_chunks, np.int64)
+
+    for k in prange(num_chunks):
+        lo = k * chunk_size
+        hi = min(lo + chunk_size, num_alignments)
 
+        # Positions in the chunk are relative to lo
+        found = reversed_bm_kernel(text_arr[lo:hi + m - 1], pat_arr, bad_char_ptr, bad_char_pos,
+                                   good_suffix_arr, matched_prefix_arr, hi - lo + m - 2)
+        num_found = len(found)
+        occurrence[lo:lo + num_found] = found + lo
+        counts[k] = num_found
 
-def reversed_boyer_moore(text: str, pat: str) -> list[int]:
+    # Copy the occurrences of each chunk after the chunks to its right
+    result = np.empty(counts.sum(), np.int64)
+    count = 0
+    for k in range(num_chunks - 1, -1, -1):
+        lo = k * chunk_size
+        result[count:count + counts[k]] = occurrence[lo:lo + counts[k]]
+        count += counts[k]
+
+    return result
+
+
+if njit is not None:
+    parallel_bm_kernel = njit(cache=True, boundscheck=False, parallel=True)(parallel_bm_kernel)
+
+
+def reversed_boyer_moore(text: str | bytes | memoryview, pat: str | bytes) -> list[int]:
     """
     Applying a reversed version of Boyer Moore algorithm on a text and pattern. Similar to the
     regular Boyer Moore algorithm, but the reversed version starts from right and shifts to the
@@ -254,8 +1123,8 @@ def reversed_boyer_moore(text: str, pat: str) -> list[int]:
     comparison is still needed on those shifts
 
     Parameters:
-    text (str): Text string to allow pattern to scan on
-    pat (str): Pattern string that scans the text for occurrences
+    text (str | bytes | memoryview): Text string to allow pattern to scan on, a memoryview is read in place
+    pat (str | bytes): Pattern string that scans the text for occurrences
 
     Returns:
     list[int]: A list of integers that contains indices where pattern is found in text
@@ -263,17 +1132,71 @@ def reversed_boyer_moore(text: str, pat: str) -> list[int]:
     Note:
     - O(n) time complexity, since optimizations where considered and made sure that no repeated 
     comparisons are occuring
+    - With Numba installed, ASCII text is matched in reversed_bm_kernel, split into chunks that are
+      matched in parallel with parallel_bm_kernel when Numba has more than one thread and there
+      are at least PARALLEL_MIN_LEN alignments
+    - With only NumPy installed, ASCII text is first searched with pair_prefilter and the Python
+      main loop only runs on the part of the text it leaves
+    - Without Numba, ASCII patterns of up to HORSPOOL_MAX_PAT characters use reversed_horspool
+    - The Python main loop indexes the dense reversed_ext_bad_char array for ASCII patterns of up
+      to BAD_CHAR_DENSE_MAX characters, otherwise it binary searches the positions of the mismatched
+      character, which takes O(m) space and handles characters outside of ASCII
+    - Preprocessing tables come from bm_tables, so they are only built once for a pattern
+      that is searched for again
+    - reversed_bm_kernel writes occurrences into a preallocated int64 buffer, the Python loops
+      append to a list since that is cheaper than storing into an array in CPython
     """
     n = len(text)
     m = len(pat)
 
-    bad_char_arr = reversed_ext_bad_char(pat)
-    good_suffix_arr = reversed_good_suffix(pat)
-    matched_prefix_arr = reversed_matched_prefix(pat)
-
     occurrence = []
 
+    # ASCII text and pattern are matched as bytes, so characters are read as their codes without ord
+    ascii_only = is_ascii(text) and is_ascii(pat)
+    if ascii_only:
+        text = to_bytes(text)
+        pat = to_bytes(pat)
+
+    # Tables of the converted pattern, so its characters are the same type as the characters of the text
+    tables = bm_tables(pat)
+
     i = n - 1
+    if 0 < m <= n and ascii_only:
+        # Run the whole text through the compiled main loop
+        if njit is not None:
+            bad_char_ptr, bad_char_pos, good_suffix_arr, matched_prefix_arr = tables.reversed_tables_np
+            text_arr = np.frombuffer(text, np.uint8)
+            pat_arr = np.frombuffer(pat, np.uint8)
+
+            # Long texts are split between the threads
+            if get_num_threads() > 1 and n - m + 1 >= PARALLEL_MIN_LEN:
+                return parallel_bm_kernel(text_arr, pat_arr, bad_char_ptr, bad_char_pos, good_suffix_arr,
+                                          matched_prefix_arr, i, PARALLEL_CHUNK).tolist()
+
+            return reversed_bm_kernel(text_arr, pat_arr, bad_char_ptr, bad_char_pos, good_suffix_arr,
+                                      matched_prefix_arr, i).tolist()
+
+        # Let the prefilter find the occurrences at the right of the text, then continue where it stopped
+        if np is not None:
+            occurrence, i = pair_prefilter(text, pat)
+
+        # Short patterns are faster with Horspool than the Python main loop
+        if m <= HORSPOOL_MAX_PAT:
+            occurrence += reversed_horspool(text, pat, i)
+            return occurrence
+
+    # Bytes of patterns up to BAD_CHAR_DENSE_MAX characters index the dense bad character array
+    # directly, anything else searches the positions of the mismatched character
+    dense_bad_char = ascii_only and m <= BAD_CHAR_DENSE_MAX
+    if dense_bad_char:
+        # Built for this search only, so the cache doesn't keep m x |N| ints for every pattern
+        bad_char_arr = reversed_ext_bad_char(pat)
+    else:
+        bad_char_pos = tables.reversed_bad_char_positions
+
+    good_suffix_arr = tables.reversed_good_suffix
+    matched_prefix_arr = tables.reversed_matched_prefix
+
     start = stop = NAN
     while True:
         # Get the index of the text relative to the left most index of pat
@@ -290,7 +1213,8 @@ def reversed_boyer_moore(text: str, pat: str) -> list[int]:
             if pattern_pointer == start:
                 pattern_pointer = stop + 1
 
-            if pattern_pointer == m:
+            # Skipping the range that is known to match can go past the end of pat
+            if pattern_pointer >= m:
                 occurrence.append(search_index_on_text + 1)
                 shift_amt = m - matched_prefix_arr[-2]
 
@@ -315,22 +1239,31 @@ def reversed_boyer_moore(text: str, pat: str) -> list[int]:
                 # Char mismatch in text
                 char_mismatch = text[search_index_on_text + pattern_pointer]
                 # Get left-rightmost mismatch character from bad character array
-                bc_index = bad_char_arr[pattern_pointer][ord(char_mismatch)]
+                if dense_bad_char:
+                    bc_index = bad_char_arr[pattern_pointer * ASCII_SIZE + char_mismatch]
+                else:
+                    # First position of the character after the mismatch, with a binary search in C
+                    positions = bad_char_pos.get(char_mismatch, ())
+                    k = bisect_right(positions, pattern_pointer)
+                    bc_index = m - 1 - positions[k] if k < len(positions) else NAN
                 # Calculate bad character shift, using length of pat to minus bc_index to reverse index
                 bc_shift = m - 1 - bc_index - pattern_pointer
 
                 # Good suffix and matched prefix array follows 1 based indexing, since the m + 1 index is now 0 index
                 if good_suffix_arr[pattern_pointer] == NAN:
-                    # Use matched prefix when good suffix is None
+                    # Use matched prefix when good suffix is NAN
                     gs_shift = m - matched_prefix_arr[pattern_pointer]
                 else:
                     gs_shift = m - 1 - good_suffix_arr[pattern_pointer]
 
-                shift_amt = max(bc_shift, gs_shift)
+                # Compare the shifts once and reuse the result, cheaper than calling max
+                bc_larger = bc_shift > gs_shift
+                same_shift = bc_shift == gs_shift
+                shift_amt = bc_shift if bc_larger else gs_shift
 
                 # Optimization
                 # If my prefix length == 0 and the shift amount is the same for bc and gs then choose bc shift
-                if (pattern_pointer - 1 == NAN and bc_shift == gs_shift) or bc_shift > gs_shift:
+                if (pattern_pointer - 1 == NAN and same_shift) or bc_larger:
                     # If the bad character index is NAN then reset start, stop. Cant optimize
                     if bc_index == NAN:
                         start = stop = NAN
@@ -349,7 +1282,7 @@ def reversed_boyer_moore(text: str, pat: str) -> list[int]:
                         stop = start + pattern_pointer - 1
                         # If shift for bc and gs are the same then we optimize the bad character by adding 1
                         # This only happens when gs and bs are side by side so we can optimize the bc as well
-                        if bc_shift == gs_shift:
+                        if same_shift:
                             stop += 1
                 else:
                     start = stop = NAN
@@ -359,14 +1292,27 @@ def reversed_boyer_moore(text: str, pat: str) -> list[int]:
     return occurrence
 
 
-if __name__ == "__main__":
-    _, text_file, pat_file = sys.argv
+def boyer_moore(text: str | bytes | memoryview, pat: str | bytes) -> list[int]:
+    """
+    Find the occurrences of pattern in text in the same order as reversed_boyer_moore.
+    ASCII patterns of up to HORSPOOL_MAX_PAT characters are scanned forwards with
+    boyer_moore_horspool_forward, everything else uses reversed_boyer_moore
 
-    text = read_file(text_file)
-    pat = read_file(pat_file)
-    result = reversed_boyer_moore(text, pat)
+    Parameters:
+    text (str | bytes | memoryview): Text string to allow pattern to scan on, a memoryview is read in place
+    pat (str | bytes): Pattern string that scans the text for occurrences
 
-    result_str = "\n".join(map(str, result))
+    Returns:
+    list[int]: A list of integers that contains indices where pattern is found in text, in decreasing order
+    """
+    m = len(pat)
+    if 0 < m <= HORSPOOL_MAX_PAT and m <= len(text) and is_ascii(text) and is_ascii(pat):
+        occurrence = boyer_moore_horspool_forward(to_bytes(text), to_bytes(pat))
+        occurrence.reverse()
+        return occurrence
+
+    return reversed_boyer_moore(text, pat)
 
-    output_file = "output_boyer_moore.txt"
-    write_file(output_file, result_str)
+
+if __name__ == "__main__":
+    run_pat_match(boyer_moore, "output_boyer_moore.txt", read_file_mmap)
@@ -1,28 +1,141 @@
-def read_file(file_path: str) -> str:
+import mmap
+import os
+import re
+import stat
+import sys
+from typing import Callable
+
+# Matches any byte outside of ASCII
+NON_ASCII = re.compile(rb"[\x80-\xff]")
+
+
+def read_file(file_path: str) -> bytes:
     """
-    Given a file path read the contents of a file
+    Given a file path read the contents of a file as bytes, without decoding them
 
     Parameters:
     file_path (str): file path to read the files at
 
     Returns:
-    str: Contents of the file
+    bytes: Contents of the file
     """
-    f = open(file_path, 'r')
-    text = f.read()
-    f.close()
+    with open(file_path, 'rb') as f:
+        return f.read()
 
-    return text
 
+def read_file_mmap(file_path: str) -> bytes | memoryview:
+    """
+    Given a file path map the contents of a file into memory read only, pages of the
+    file are loaded from the page cache as they are accessed instead of the whole file
+    being copied into a bytes object first
 
-def write_file(file_path: str, content: str) -> None:
+    Parameters:
+    file_path (str): file path to read the files at
+
+    Returns:
+    bytes | memoryview: Contents of the file
+
+    Note:
+    - Only non empty regular files can be mapped, anything else like a pipe reports a size
+      of 0 and is read with read_file instead
     """
-    Given file path and the content, write content to the file
+    with open(file_path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode) or not st.st_size:
+            return read_file(file_path)
+
+        # The mapping stays valid after the file is closed
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def write_file(file_path: str, content: str | bytes) -> None:
+    """
+    Given file path and the content, write content to the file, bytes are written
+    as they are without encoding
 
     Parameters:
     file_path (str): file path to write the files to
-    content (str): Content to write into the file
+    content (str | bytes): Content to write into the file
     """
-    f = open(file_path, "w")
+    f = open(file_path, "wb" if isinstance(content, bytes) else "w")
     f.write(content)
     f.close()
+
+
+def format_occurrences(occurrences: list[int]) -> bytes:
+    """
+    Format each occurrence on its own line as bytes, with no newline after the last one.
+    The whole output is formatted with a single bytes format of every occurrence, so no
+    str is created for each occurrence and the result doesn't need to be encoded
+
+    Parameters:
+    occurrences (list[int]): Occurrences to format
+
+    Returns:
+    bytes: Formatted occurrences
+    """
+    if not occurrences:
+        return b""
+
+    return (b"%d" + b"\n%d" * (len(occurrences) - 1)) % tuple(occurrences)
+
+
+def to_bytes(content: str | bytes | memoryview) -> bytes | memoryview:
+    """
+    Given a string, encode it into bytes with one byte per character so that
+    the indices of the bytes match the indices of the string and indexing the
+    bytes gives the character code directly without calling ord. Bytes and
+    memoryviews are returned as they are
+
+    Parameters:
+    content (str | bytes | memoryview): String to encode, must only contain ASCII characters
+
+    Returns:
+    bytes | memoryview: Encoded content
+
+    Raises:
+    UnicodeEncodeError: If content contains a character outside of ASCII
+    """
+    if not isinstance(content, str):
+        return content
+
+    return content.encode("ascii")
+
+
+def is_ascii(content: str | bytes | memoryview) -> bool:
+    """
+    Check if every character of content is ASCII, a memoryview is searched in place
+    for a non ASCII byte since it has no isascii
+
+    Parameters:
+    content (str | bytes | memoryview): Content to check
+
+    Returns:
+    bool: True if content only contains ASCII characters
+    """
+    if isinstance(content, memoryview):
+        return NON_ASCII.search(content) is None
+
+    return content.isascii()
+
+
+def run_pat_match(pat_match: Callable[[bytes, bytes], list[int]], output_file: str,
+                  read_text: Callable[[str], bytes | memoryview] = read_file) -> None:
+    """
+    Command line entry point shared by the pattern matching scripts, reads the text
+    file and pattern file given as arguments, runs pat_match on them and writes
+    each occurrence on its own line to the output file
+
+    Parameters:
+    pat_match (Callable[[bytes, bytes], list[int]]): Pattern matching function taking the text and pattern
+    output_file (str): file path to write the occurrences to
+    read_text (Callable[[str], bytes | memoryview]): Function to read the text file with, the
+                                                      pattern file is always read with read_file
+    """
+    _, text_file, pat_file = sys.argv
+
+    text = read_text(text_file)
+    pat = read_file(pat_file)
+    result = pat_match(text, pat)
+
+    write_file(output_file, format_occurrences(result))